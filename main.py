@@ -13,7 +13,6 @@ import platform
 import argparse
 import logging
 from datetime import datetime
-from multiprocessing import Pool
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -36,6 +35,19 @@ except ImportError as e:
     logger.error(f"Error importing modules: {e}. Ensure all dependencies are installed.")
     sys.exit(1)
 
+# Pipeline components are built once per process and shared across
+# process_logs calls — component construction (matplotlib styling, NLP
+# resources, sklearn estimators) is not free in a polling loop
+_COMPONENTS = None
+
+
+def _get_components():
+    """Return the shared (LogParser, AnomalyDetector, NLPAnalyzer, Visualizer) stack."""
+    global _COMPONENTS
+    if _COMPONENTS is None:
+        _COMPONENTS = (LogParser(), AnomalyDetector(), NLPAnalyzer(), Visualizer())
+    return _COMPONENTS
+
 
 def process_logs(log_file_path=None, output_dir=None, generate_report=True, open_report=False, 
                  use_elasticsearch=False, es_index=None, time_range=None, write_results=True):
@@ -45,11 +57,8 @@ def process_logs(log_file_path=None, output_dir=None, generate_report=True, open
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    # Initialize components
-    log_parser = LogParser()
-    anomaly_detector = AnomalyDetector()
-    nlp_analyzer = NLPAnalyzer()
-    visualizer = Visualizer()
+    # Initialize (or reuse) components
+    log_parser, anomaly_detector, nlp_analyzer, visualizer = _get_components()
     es_connector = None
     
     if use_elasticsearch:
@@ -70,11 +79,21 @@ def process_logs(log_file_path=None, output_dir=None, generate_report=True, open
             sys.exit(1)
     elif log_file_path:
         logger.info(f"Processing log file: {log_file_path}")
-        # Parse log file
+        # Parse and analyze the file chunk by chunk so large files never
+        # need to fit in memory during the expensive stages; the anomaly
+        # detector's model cache keeps later chunks on the predict-only path
         logger.info("Parsing logs...")
         try:
-            with Pool(processes=4) as pool:  # Parallel processing
-                logs_df = pool.apply(log_parser.parse_log_file, (log_file_path,))
+            analyzed_chunks = []
+            for chunk_df in log_parser.parse_log_file_chunks(log_file_path):
+                if chunk_df.empty:
+                    continue
+                chunk_df = log_parser.extract_features(chunk_df)
+                chunk_df = log_parser.preprocess_for_ml(chunk_df)
+                chunk_df = anomaly_detector.analyze(chunk_df)
+                analyzed_chunks.append(chunk_df)
+            if analyzed_chunks:
+                logs_df = pd.concat(analyzed_chunks, ignore_index=True)
         except Exception as e:
             logger.error(f"Error processing logs: {e}")
             sys.exit(1)
@@ -86,16 +105,19 @@ def process_logs(log_file_path=None, output_dir=None, generate_report=True, open
         logger.error("No valid log entries found. Exiting.")
         sys.exit(1)
 
-    # Extract features
-    logger.info("Extracting features...")
-    logs_df = log_parser.extract_features(logs_df)
-    
-    # Prepare for ML analysis
-    logs_df = log_parser.preprocess_for_ml(logs_df)
+    # Frames from Elasticsearch arrive unanalyzed; file input was already
+    # processed chunk by chunk above
+    if not log_file_path:
+        # Extract features
+        logger.info("Extracting features...")
+        logs_df = log_parser.extract_features(logs_df)
+
+        # Prepare for ML analysis
+        logs_df = log_parser.preprocess_for_ml(logs_df)
 
-    # Detect anomalies
-    logger.info("Detecting anomalies...")
-    logs_df = anomaly_detector.analyze(logs_df)
+        # Detect anomalies
+        logger.info("Detecting anomalies...")
+        logs_df = anomaly_detector.analyze(logs_df)
 
     # Perform NLP analysis
     logger.info("Performing NLP analysis...")
@@ -7,14 +7,20 @@ Handles interactions with Elasticsearch for reading and writing security data.
 import os
 import json
 import logging
-from datetime import datetime
+import pandas as pd
+from datetime import datetime, timezone
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import parallel_bulk, scan
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Shared transports keyed by destination: constructing several connectors
+# against the same cluster reuses the pooled connections and pays the
+# ping/info round-trips only once per process
+_CLIENTS = {}
+
 class ElasticsearchConnector:
     """Handles all interactions with Elasticsearch."""
     
@@ -25,18 +31,37 @@ class ElasticsearchConnector:
         self.password = password or os.getenv("ES_PASSWORD", "changeme")
         self.use_ssl = use_ssl
         self.client = None
+        # Indices already verified or created by this connector; saves an
+        # exists() round-trip on every write
+        self._indices_ensured = set()
         self.connect()
         
     def connect(self):
-        """Establish connection to Elasticsearch."""
+        """Establish a connection to Elasticsearch, reusing a cached transport."""
+        key = (tuple(self.hosts), self.username)
+        cached = _CLIENTS.get(key)
+        if cached is not None:
+            self.client = cached
+            return
+
         try:
-            self.client = Elasticsearch(
+            client = Elasticsearch(
                 self.hosts,
                 basic_auth=(self.username, self.password),
-                verify_certs=self.use_ssl
+                verify_certs=self.use_ssl,
+                # Wire and transport tuning: gzip the payloads, keep enough
+                # pooled connections for parallel_bulk, and retry timeouts
+                # instead of failing a whole load
+                http_compress=True,
+                maxsize=25,
+                request_timeout=60,
+                retry_on_timeout=True,
+                max_retries=3
             )
-            if self.client.ping():
-                logger.info(f"Connected to Elasticsearch cluster: {self.client.info()['cluster_name']}")
+            if client.ping():
+                logger.info(f"Connected to Elasticsearch cluster: {client.info()['cluster_name']}")
+                _CLIENTS[key] = client
+                self.client = client
             else:
                 logger.error("Failed to connect to Elasticsearch")
                 self.client = None
@@ -44,112 +69,171 @@ class ElasticsearchConnector:
             logger.error(f"Error connecting to Elasticsearch: {e}")
             self.client = None
     
-    def fetch_logs(self, index_pattern="filebeat-*", time_range=None, query=None, size=10000):
-        """Fetch logs from Elasticsearch."""
+    def iter_logs(self, index_pattern="filebeat-*", time_range=None, query=None, batch_size=1000):
+        """Yield matching log documents one at a time.
+
+        Uses the scroll helper so result sets larger than
+        index.max_result_window stream through in batch_size pages instead
+        of one deep from+size search.
+        """
         if not self.client:
             logger.error("Not connected to Elasticsearch")
-            return None
-            
-        try:
-            # Default query matches all documents
-            search_query = {"match_all": {}}
-            
-            # Build the query
-            body = {
-                "size": size,
-                "query": {
-                    "bool": {
-                        "must": [search_query]
-                    }
-                },
-                "sort": [{"@timestamp": {"order": "desc"}}]
+            return
+
+        # Default query matches all documents
+        search_query = query or {"match_all": {}}
+
+        # Build the query
+        body = {
+            "query": {
+                "bool": {
+                    "must": [search_query]
+                }
             }
-            
-            # Add time range if provided
-            if time_range:
-                body["query"]["bool"]["filter"] = [
-                    {
-                        "range": {
-                            "@timestamp": time_range
-                        }
+        }
+
+        # Add time range if provided
+        if time_range:
+            body["query"]["bool"]["filter"] = [
+                {
+                    "range": {
+                        "@timestamp": time_range
                     }
-                ]
-            
-            # Add custom query if provided
-            if query:
-                body["query"]["bool"]["must"] = [query]
-            
-            # Execute search
-            response = self.client.search(index=index_pattern, body=body)
-            
-            # Convert to DataFrame-friendly format
-            hits = response["hits"]["hits"]
-            logs = []
-            for hit in hits:
-                source = hit["_source"]
-                # Add the Elasticsearch document ID
-                source["_id"] = hit["_id"]
-                logs.append(source)
-                
+                }
+            ]
+
+        for hit in scan(self.client, index=index_pattern, query=body,
+                        size=batch_size, preserve_order=False):
+            source = hit["_source"]
+            # Add the Elasticsearch document ID
+            source["_id"] = hit["_id"]
+            yield source
+
+    def fetch_logs(self, index_pattern="filebeat-*", time_range=None, query=None, size=1000):
+        """Fetch logs from Elasticsearch as a list; see iter_logs to stream."""
+        if not self.client:
+            logger.error("Not connected to Elasticsearch")
+            return None
+
+        try:
+            logs = list(self.iter_logs(index_pattern=index_pattern,
+                                       time_range=time_range,
+                                       query=query, batch_size=size))
             logger.info(f"Retrieved {len(logs)} logs from Elasticsearch")
             return logs
-            
+
         except Exception as e:
             logger.error(f"Error fetching logs from Elasticsearch: {e}")
             return None
     
-    def write_analysis_results(self, df, index_name="security-analysis"):
-        """Write analysis results back to Elasticsearch."""
+    def write_analysis_results(self, df, index_name="security-analysis",
+                               chunk_size=1000, max_chunk_bytes=10 * 1024 * 1024,
+                               thread_count=12):
+        """Write analysis results back to Elasticsearch.
+
+        chunk_size and max_chunk_bytes bound each bulk request; thread_count
+        sets how many requests are in flight at once and should be tuned to
+        the cluster's indexing thread pool.
+        """
         if not self.client:
             logger.error("Not connected to Elasticsearch")
             return False
             
         try:
-            # Create index with appropriate mappings if it doesn't exist
-            if not self.client.indices.exists(index=index_name):
-                mappings = {
-                    "mappings": {
-                        "properties": {
-                            "@timestamp": {"type": "date"},
-                            "message": {"type": "text"},
-                            "log_level": {"type": "keyword"},
-                            "source_ip": {"type": "ip"},
-                            "is_anomaly": {"type": "boolean"},
-                            "anomaly_score": {"type": "float"},
-                            "security_term_count": {"type": "integer"},
-                            "sentiment_score": {"type": "float"},
-                            "analysis_timestamp": {"type": "date"}
+            # Create index with appropriate mappings if it doesn't exist;
+            # checked at most once per index per connector
+            if index_name not in self._indices_ensured:
+                if not self.client.indices.exists(index=index_name):
+                    mappings = {
+                        "mappings": {
+                            "properties": {
+                                "@timestamp": {"type": "date"},
+                                "message": {"type": "text"},
+                                "log_level": {"type": "keyword"},
+                                "source_ip": {"type": "ip"},
+                                "is_anomaly": {"type": "boolean"},
+                                "anomaly_score": {"type": "float"},
+                                "security_term_count": {"type": "integer"},
+                                "sentiment_score": {"type": "float"},
+                                "analysis_timestamp": {"type": "date"}
+                            }
                         }
                     }
-                }
-                self.client.indices.create(index=index_name, body=mappings)
-                logger.info(f"Created index {index_name} with security analysis mappings")
-            
-            # Prepare documents for bulk indexing
-            actions = []
-            for _, row in df.iterrows():
-                doc = row.to_dict()
-                # Add analysis timestamp
-                doc["analysis_timestamp"] = datetime.now().isoformat()
-                
-                # Handle non-serializable objects
-                for key, value in doc.items():
-                    if not isinstance(value, (str, int, float, bool, list, dict)) and value is not None:
-                        doc[key] = str(value)
-                
-                action = {
-                    "_index": index_name,
-                    "_source": doc
-                }
-                
-                # Add document ID if available
-                if "_id" in doc:
-                    action["_id"] = doc["_id"]
-                    
-                actions.append(action)
+                    self.client.indices.create(index=index_name, body=mappings)
+                    logger.info(f"Created index {index_name} with security analysis mappings")
+                self._indices_ensured.add(index_name)
             
-            # Perform bulk indexing
-            success, failed = bulk(self.client, actions, stats_only=True)
+            # Handle non-serializable values once per column instead of an
+            # isinstance check per cell: datetime columns become ISO strings
+            # and object columns holding exotic types are stringified whole
+            converted = {}
+            for col, dtype in df.dtypes.items():
+                if pd.api.types.is_datetime64_any_dtype(dtype):
+                    converted[col] = df[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
+                elif dtype == object:
+                    sample = df[col].dropna()
+                    if len(sample) and not isinstance(
+                            sample.iloc[0], (str, int, float, bool, list, dict)):
+                        converted[col] = df[col].astype(str)
+            if converted:
+                df = df.assign(**converted)
+
+            # Stream documents through the bulk helper instead of
+            # materializing the full action list up front; itertuples keeps
+            # row iteration off the per-row Series path. One UTC timestamp
+            # covers the whole batch
+            analysis_timestamp = datetime.now(timezone.utc).isoformat()
+            columns = df.columns.tolist()
+
+            def generate_actions():
+                for row in df.itertuples(index=False, name=None):
+                    doc = dict(zip(columns, row))
+                    # Add analysis timestamp
+                    doc["analysis_timestamp"] = analysis_timestamp
+
+                    action = {
+                        "_index": index_name,
+                        "_source": doc
+                    }
+
+                    # Add document ID if available
+                    if "_id" in doc:
+                        action["_id"] = doc["_id"]
+
+                    yield action
+
+            # Disable refresh and replica fan-out for the duration of the
+            # load; segments are built once and replicated after instead of
+            # churning on every chunk
+            self.client.indices.put_settings(
+                index=index_name,
+                body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}}
+            )
+
+            success, failed = 0, 0
+            try:
+                # Index chunks concurrently; a single request pipeline leaves
+                # the cluster's indexing threads idle between round trips
+                for ok, _ in parallel_bulk(self.client, generate_actions(),
+                                           thread_count=thread_count,
+                                           queue_size=thread_count * 2,
+                                           chunk_size=chunk_size,
+                                           max_chunk_bytes=max_chunk_bytes,
+                                           raise_on_error=False,
+                                           request_timeout=60):
+                    if ok:
+                        success += 1
+                    else:
+                        failed += 1
+            finally:
+                # Restore normal refresh/replication and compact the
+                # segments produced by the load
+                self.client.indices.put_settings(
+                    index=index_name,
+                    body={"index": {"refresh_interval": "30s", "number_of_replicas": 1}}
+                )
+                self.client.indices.forcemerge(index=index_name, max_num_segments=5)
+
             logger.info(f"Indexed {success} documents to {index_name}, {failed} failed")
             return success > 0
             
@@ -1,121 +1,416 @@
+import mmap
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+try:
+    import re2 as _re2  # linear-time engine, optional
+except ImportError:
+    _re2 = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+# Number of lines handed to the parser per chunk when streaming large files
+DEFAULT_CHUNK_SIZE = 500_000
+
+# Files below this size are parsed in-process; forking workers costs more
+# than the parse itself
+MIN_PARALLEL_BYTES = 1 << 20
+
+# One parser per worker process, built lazily and reused across ranges
+_WORKER_PARSER = None
+
+
+def _fixed_layout_kernel(buf, starts, ends, bounds, kinds):
+    """Tokenize fixed-layout 'YYYY-MM-DD HH:MM:SS SEV ...' lines.
+
+    buf holds the whole batch as bytes; starts/ends bound each line. For
+    every line that validates, writes the absolute byte offsets
+    (sev_start, sev_end, src_start, src_end, msg_start) into bounds[i]
+    and sets kinds[i] to 1 for generic ([bracketed] source) or 2 for
+    windows (bare word source). Lines that fail any check keep kinds 0
+    and fall back to the regex path, so the checks only need to accept a
+    subset of what the regexes accept.
+    """
+    for i in range(starts.shape[0]):
+        s = starts[i]
+        e = ends[i]
+        if e - s < 21:
+            continue
+        # Validate the 19-char timestamp by position
+        ok = True
+        for off in (0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18):
+            c = buf[s + off]
+            if c < 48 or c > 57:
+                ok = False
+                break
+        if not ok:
+            continue
+        if buf[s + 4] != 45 or buf[s + 7] != 45 or buf[s + 10] != 32:
+            continue
+        if buf[s + 13] != 58 or buf[s + 16] != 58:
+            continue
+
+        # Severity: run of ASCII word chars after at least one blank
+        p = s + 19
+        q = p
+        while p < e and (buf[p] == 32 or buf[p] == 9):
+            p += 1
+        if p == q:
+            continue
+        sev_start = p
+        while p < e and ((48 <= buf[p] <= 57) or (65 <= buf[p] <= 90)
+                         or (97 <= buf[p] <= 122) or buf[p] == 95):
+            p += 1
+        if p == sev_start:
+            continue
+        sev_end = p
+        q = p
+        while p < e and (buf[p] == 32 or buf[p] == 9):
+            p += 1
+        if p == q or p >= e:
+            continue
+
+        if buf[p] == 91:  # '[' -> generic, source runs to the closing ']'
+            r = p + 1
+            while r < e and buf[r] != 93:
+                r += 1
+            if r >= e or r == p + 1:
+                continue
+            src_start = p + 1
+            src_end = r
+            p = r + 1
+            q = p
+            while p < e and (buf[p] == 32 or buf[p] == 9):
+                p += 1
+            if p == q:
+                continue
+            kind = 1
+        else:  # windows -> bare word source
+            src_start = p
+            while p < e and ((48 <= buf[p] <= 57) or (65 <= buf[p] <= 90)
+                             or (97 <= buf[p] <= 122) or buf[p] == 95):
+                p += 1
+            if p == src_start:
+                continue
+            src_end = p
+            q = p
+            while p < e and (buf[p] == 32 or buf[p] == 9):
+                p += 1
+            if p == q:
+                continue
+            kind = 2
+
+        bounds[i, 0] = sev_start
+        bounds[i, 1] = sev_end
+        bounds[i, 2] = src_start
+        bounds[i, 3] = src_end
+        bounds[i, 4] = p
+        kinds[i] = kind
+
+
+if njit is not None:
+    # Compiled, the scan runs in native code with no regex engine at all;
+    # without numba the pure-Python version would be slower than
+    # str.extract, so the fast path is only taken when njit exists
+    _fixed_layout_kernel = njit(cache=True)(_fixed_layout_kernel)
+
+
+def _parse_byte_range(file_path, start, end):
+    """Parse the [start, end) byte range of file_path in a worker process"""
+    global _WORKER_PARSER
+    if _WORKER_PARSER is None:
+        _WORKER_PARSER = LogParser()
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _WORKER_PARSER._parse_lines(data.decode('utf-8', 'replace').splitlines())
+
+
 class LogParser:
     """
     Class for parsing and preprocessing security logs
     """
     def __init__(self):
-        # Common log patterns for different security log formats
+        # Common log patterns for different security log formats, compiled
+        # once so the per-line hot loop never goes through re's pattern cache
         self.patterns = {
-            'generic': r'(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\s+(\w+)\s+\[([^\]]+)\]\s+(.*)',
-            'apache': r'(\S+) (\S+) (\S+) \[([^:]+):(\d+:\d+:\d+) ([^\]]+)\] "(\S+) (.*?) (\S+)" (\d+) (\S+)',
-            'windows': r'(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\s+(\w+)\s+(\w+)\s+(.*)',
-            'ssh': r'(\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}).*sshd\[\d+\]:\s+(.*)'
+            'generic': re.compile(r'(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\s+(\w+)\s+\[([^\]]+)\]\s+(.*)'),
+            'apache': re.compile(r'(\S+) (\S+) (\S+) \[([^:]+):(\d+:\d+:\d+) ([^\]]+)\] "(\S+) (.*?) (\S+)" (\d+) (\S+)'),
+            'windows': re.compile(r'(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\s+(\w+)\s+(\w+)\s+(.*)'),
+            'ssh': re.compile(r'(\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}).*sshd\[\d+\]:\s+(.*)')
         }
+        # Single alternation over all formats so each line is scanned once;
+        # the outer named group that matched identifies the format and the
+        # inner named groups carry the fields
+        self._combined = re.compile(
+            r'(?P<generic>(?P<gen_ts>\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\s+(?P<gen_sev>\w+)\s+\[(?P<gen_src>[^\]]+)\]\s+(?P<gen_msg>.*))'
+            r'|(?P<apache>(?P<ap_ip>\S+) (?P<ap_ident>\S+) (?P<ap_user>\S+) \[(?P<ap_date>[^:]+):(?P<ap_time>\d+:\d+:\d+) (?P<ap_zone>[^\]]+)\] "(?P<ap_method>\S+) (?P<ap_path>.*?) (?P<ap_proto>\S+)" (?P<ap_status>\d+) (?P<ap_size>\S+))'
+            r'|(?P<windows>(?P<win_ts>\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\s+(?P<win_sev>\w+)\s+(?P<win_src>\w+)\s+(?P<win_msg>.*))'
+            r'|(?P<ssh>(?P<ssh_ts>\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}).*sshd\[\d+\]:\s+(?P<ssh_msg>.*))'
+        )
+        # Dispatch through google-re2 when it is installed: the DFA engine
+        # guarantees O(n) matching on the unbounded .*/\S+ alternations, so
+        # pathological lines can't stall the per-line path
+        if _re2 is not None:
+            try:
+                self._combined = _re2.compile(self._combined.pattern)
+            except Exception:
+                # re2 rejects some constructs; keep the stdlib pattern then
+                pass
+        # Anchored variants for the vectorized extract path —
+        # Series.str.extract searches anywhere in the string, while the
+        # per-line matcher anchors at the start
+        self._anchored = {
+            name: re.compile('^' + pattern.pattern)
+            for name, pattern in self.patterns.items()
+        }
+        # Sub-patterns for enriching SSH messages
+        self._user_re = re.compile(r'user (\S+)')
+        self._ip_re = re.compile(r'from (\d+\.\d+\.\d+\.\d+)')
+        # Security keywords flagged by extract_features; compiled once so
+        # str.contains skips re's pattern-cache lookup on every call
+        self._security_re = re.compile(
+            r'fail|error|warn|attack|invalid|compromise|threat|attempt|denied|violation|suspicious',
+            re.IGNORECASE)
     
     def detect_log_type(self, log_line):
         """Determine the type of log based on its pattern"""
-        for log_type, pattern in self.patterns.items():
-            if re.match(pattern, log_line):
-                return log_type
-        return "unknown"
+        log_type, _ = self._match_line(log_line)
+        return log_type
+
+    def _match_line(self, log_line):
+        """Match a line against all formats in one scan.
+
+        Returns (log_type, match); ('unknown', None) when nothing matches.
+        """
+        match = self._combined.match(log_line)
+        if match:
+            for log_type in self.patterns:
+                if match.group(log_type) is not None:
+                    return log_type, match
+        return "unknown", None
     
     def parse_log_file(self, file_path):
         """
         Parse a log file and convert it to a pandas DataFrame
         """
-        log_data = []
-        
+        # mmap can't map an empty file
+        if os.path.getsize(file_path) == 0:
+            return pd.DataFrame()
+
+        # Map the file instead of streaming it through the text-mode io
+        # stack: the kernel pages the bytes in directly and the buffer is
+        # decoded in one call rather than line by line
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                lines = mm[:].decode('utf-8', 'replace').splitlines()
+        return self._parse_lines(lines)
+
+    def parse_log_file_parallel(self, file_path, n_workers=None):
+        """
+        Parse a log file across CPU cores and return one DataFrame
+
+        The file is split into n_workers byte ranges aligned to newline
+        boundaries; each worker parses its range independently and the
+        per-range frames are concatenated. Small files fall through to the
+        single-process path since process startup would dominate.
+        """
+        size = os.path.getsize(file_path)
+        n_workers = n_workers or os.cpu_count() or 1
+        if n_workers <= 1 or size < MIN_PARALLEL_BYTES:
+            return self.parse_log_file(file_path)
+
+        # Seek to the rough split points and advance past the next newline
+        # so no line straddles two ranges
+        offsets = [0]
+        with open(file_path, 'rb') as f:
+            for i in range(1, n_workers):
+                f.seek(size * i // n_workers)
+                f.readline()
+                offsets.append(min(f.tell(), size))
+        offsets.append(size)
+
+        starts, ends = zip(*[(lo, hi) for lo, hi in zip(offsets, offsets[1:])
+                             if hi > lo])
+        with ProcessPoolExecutor(max_workers=len(starts)) as pool:
+            frames = list(pool.map(_parse_byte_range,
+                                   [file_path] * len(starts), starts, ends))
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        # Concatenating categoricals with differing category sets falls back
+        # to object; re-establish the dtype over the combined frame
+        if 'source' in df.columns:
+            df['source'] = df['source'].astype('category')
+        return df
+
+    def parse_log_file_chunks(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Parse a log file in chunks, yielding one DataFrame per chunk_size
+        lines so multi-GB files never have to fit in memory at once
+        """
         with open(file_path, 'r') as f:
-            for line in f:
-                log_type = self.detect_log_type(line.strip())
-                
-                if log_type == "unknown":
-                    # Store unparsed lines with minimal info
-                    log_data.append({
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'log_type': 'unknown',
-                        'severity': 'INFO',
-                        'message': line.strip(),
-                        'source': 'unknown'
-                    })
-                    continue
-                
-                # Parse according to the detected type
-                if log_type == 'generic':
-                    match = re.match(self.patterns[log_type], line.strip())
-                    if match:
-                        timestamp, severity, source, message = match.groups()
-                        log_data.append({
-                            'timestamp': timestamp,
-                            'log_type': log_type,
-                            'severity': severity,
-                            'source': source,
-                            'message': message
-                        })
-                
-                elif log_type == 'apache':
-                    match = re.match(self.patterns[log_type], line.strip())
-                    if match:
-                        ip, ident, user, date, time, zone, method, path, protocol, status, size = match.groups()
-                        log_data.append({
-                            'timestamp': f"{date} {time}",
-                            'log_type': log_type,
-                            'severity': 'INFO',
-                            'source': ip,
-                            'message': f"{method} {path} {protocol} {status}",
-                            'status_code': status,
-                            'request_path': path
-                        })
-                
-                elif log_type == 'windows':
-                    match = re.match(self.patterns[log_type], line.strip())
-                    if match:
-                        timestamp, severity, source, message = match.groups()
-                        log_data.append({
-                            'timestamp': timestamp,
-                            'log_type': log_type, 
-                            'severity': severity,
-                            'source': source,
-                            'message': message
-                        })
-                        
-                elif log_type == 'ssh':
-                    match = re.match(self.patterns[log_type], line.strip())
-                    if match:
-                        timestamp, message = match.groups()
-                        # Determine if this is a failed login attempt
-                        is_failed = "Failed password" in message or "Invalid user" in message
-                        severity = "WARNING" if is_failed else "INFO"
-                        
-                        # Extract username and IP if available
-                        user_match = re.search(r'user (\S+)', message)
-                        ip_match = re.search(r'from (\d+\.\d+\.\d+\.\d+)', message)
-                        
-                        username = user_match.group(1) if user_match else "unknown"
-                        source_ip = ip_match.group(1) if ip_match else "unknown"
-                        
-                        log_data.append({
-                            'timestamp': timestamp,
-                            'log_type': log_type,
-                            'severity': severity,
-                            'source': source_ip,
-                            'username': username,
-                            'message': message,
-                            'failed_attempt': is_failed
-                        })
-        
-        # Convert to DataFrame
-        return pd.DataFrame(log_data)
-    
+            while True:
+                lines = list(islice(f, chunk_size))
+                if not lines:
+                    break
+                yield self._parse_lines(lines)
+
+    def _parse_lines(self, lines):
+        """
+        Parse an iterable of log lines into a DataFrame
+
+        Each format's regex runs once over the whole batch via
+        Series.str.extract, so the per-line work happens in pandas rather
+        than a Python loop; lines are tried against the formats in priority
+        order and only the unmatched remainder moves on to the next one.
+        """
+        lines = pd.Series(lines, dtype=object).str.strip()
+
+        frames = []
+        remaining = lines
+        if njit is not None and not remaining.empty:
+            # Native tokenizer handles the fixed-layout formats (usually the
+            # bulk of a file) without touching the regex engine
+            fast_frames, remaining = self._tokenize_fixed(remaining)
+            frames.extend(fast_frames)
+        for log_type in self.patterns:
+            if remaining.empty:
+                break
+            fields = remaining.str.extract(self._anchored[log_type])
+            matched = fields[0].notna()
+            if matched.any():
+                frames.append(self._build_frame(log_type, fields[matched]))
+                remaining = remaining[~matched]
+
+        # Store unparsed lines with minimal info
+        if not remaining.empty:
+            frames.append(pd.DataFrame({
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'log_type': 'unknown',
+                'severity': 'INFO',
+                'message': remaining,
+                'source': 'unknown'
+            }, index=remaining.index))
+
+        if not frames:
+            return pd.DataFrame()
+
+        # Restore the original line order after the per-format passes
+        df = pd.concat(frames).sort_index().reset_index(drop=True)
+
+        # Normalize timestamps to datetime64 once at ingest; cache=True makes
+        # repeated timestamp strings essentially free to convert
+        if 'timestamp' in df.columns:
+            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce', cache=True)
+
+        # Sources are heavily repeated IPs/hostnames; the category dtype
+        # stores each string once and turns later groupbys into code lookups
+        if 'source' in df.columns:
+            df['source'] = df['source'].astype('category')
+
+        return df
+
+    def _tokenize_fixed(self, lines):
+        """
+        Scan a batch for generic/windows lines with the native tokenizer
+
+        Returns (frames, remaining): one assembled DataFrame per format
+        found, plus the lines the tokenizer declined, which continue on to
+        the regex passes. Field strings are materialized only for lines
+        that matched.
+        """
+        raw = '\n'.join(lines.tolist()).encode('utf-8')
+        buf = np.frombuffer(raw, dtype=np.uint8)
+        breaks = np.flatnonzero(buf == 10)
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(buf)]))
+
+        bounds = np.zeros((len(lines), 5), dtype=np.int64)
+        kinds = np.zeros(len(lines), dtype=np.uint8)
+        _fixed_layout_kernel(buf, starts, ends, bounds, kinds)
+
+        frames = []
+        for kind, log_type in ((1, 'generic'), (2, 'windows')):
+            idx = np.flatnonzero(kinds == kind)
+            if idx.size == 0:
+                continue
+            frames.append(pd.DataFrame({
+                'timestamp': [raw[starts[i]:starts[i] + 19].decode('utf-8')
+                              for i in idx],
+                'log_type': log_type,
+                'severity': [raw[bounds[i, 0]:bounds[i, 1]].decode('utf-8')
+                             for i in idx],
+                'source': [raw[bounds[i, 2]:bounds[i, 3]].decode('utf-8')
+                           for i in idx],
+                'message': [raw[bounds[i, 4]:ends[i]].decode('utf-8')
+                            for i in idx]
+            }, index=lines.index[idx]))
+
+        return frames, lines[kinds == 0]
+
+    def _build_frame(self, log_type, fields):
+        """
+        Assemble the standard columns for one format from its extracted
+        regex groups (a DataFrame with one column per group)
+
+        Construction is column-oriented throughout — whole Series in, one
+        DataFrame out — so no per-row dicts are allocated and pandas never
+        has to infer a schema from a list of records
+        """
+        if log_type == 'generic' or log_type == 'windows':
+            return pd.DataFrame({
+                'timestamp': fields[0],
+                'log_type': log_type,
+                'severity': fields[1],
+                'source': fields[2],
+                'message': fields[3]
+            }, index=fields.index)
+
+        if log_type == 'apache':
+            return pd.DataFrame({
+                'timestamp': fields[3] + ' ' + fields[4],
+                'log_type': log_type,
+                'severity': 'INFO',
+                'source': fields[0],
+                'message': fields[6] + ' ' + fields[7] + ' '
+                           + fields[8] + ' ' + fields[9],
+                'status_code': fields[9],
+                'request_path': fields[7]
+            }, index=fields.index)
+
+        # ssh: flag failed logins and pull out username/IP, all vectorized
+        message = fields[1]
+        is_failed = message.str.contains('Failed password|Invalid user')
+        return pd.DataFrame({
+            'timestamp': fields[0],
+            'log_type': log_type,
+            'severity': np.where(is_failed, 'WARNING', 'INFO'),
+            'source': message.str.extract(self._ip_re)[0].fillna('unknown'),
+            'username': message.str.extract(self._user_re)[0].fillna('unknown'),
+            'message': message,
+            'failed_attempt': is_failed
+        }, index=fields.index)
+
     def extract_features(self, df):
         """
         Extract relevant features from the log data for analysis
         """
-        # Convert timestamp to datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        # Convert timestamp to datetime (already done at parse time for file
+        # input; this only runs for frames coming from other sources)
+        if not pd.api.types.is_datetime64_dtype(df['timestamp']):
+            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce', cache=True)
         
         # Extract hour of day
         df['hour'] = df['timestamp'].dt.hour
@@ -124,10 +419,7 @@ class LogParser:
         df['day_of_week'] = df['timestamp'].dt.dayofweek
         
         # Flag potential security events
-        df['is_security_event'] = df['message'].str.contains(
-            'fail|error|warn|attack|invalid|compromise|threat|attempt|denied|violation|suspicious',
-            case=False
-        )
+        df['is_security_event'] = df['message'].str.contains(self._security_re)
         
         return df
     
@@ -136,12 +428,21 @@ class LogParser:
         Prepare the log data for machine learning analysis
         """
         # Filter to include only relevant columns
-        ml_df = df[['timestamp', 'log_type', 'severity', 'message', 'source', 'is_security_event', 'hour', 'day_of_week']]
-        
-        # Create one-hot encoding for categorical variables
-        ml_df = pd.get_dummies(ml_df, columns=['log_type', 'severity'])
-        
-        # Fill any missing values
-        ml_df = ml_df.fillna('unknown')
-        
+        ml_df = df[['timestamp', 'log_type', 'severity', 'message', 'source', 'is_security_event', 'hour', 'day_of_week']].copy()
+
+        # Create one-hot encoding for categorical variables; sparse uint8
+        # columns store only the set bits instead of a dense byte per cell
+        ml_df = pd.get_dummies(ml_df, columns=['log_type', 'severity'],
+                               sparse=True, dtype=np.uint8)
+
+        # Fill missing values per dtype — a blanket fillna('unknown') would
+        # upcast the numeric columns to object and break the ML stage
+        ml_df[['hour', 'day_of_week']] = ml_df[['hour', 'day_of_week']].fillna(-1).astype('int8')
+        ml_df['is_security_event'] = ml_df['is_security_event'].fillna(False).astype(bool)
+        for col in ('message', 'source'):
+            if ml_df[col].isna().any():
+                if isinstance(ml_df[col].dtype, pd.CategoricalDtype):
+                    ml_df[col] = ml_df[col].cat.add_categories(['unknown'])
+                ml_df[col] = ml_df[col].fillna('unknown')
+
         return ml_df
\ No newline at end of file
@@ -7,9 +7,11 @@ import sys
 import platform
 import tempfile
 import subprocess
+from functools import lru_cache
 
+@lru_cache(maxsize=1)
 def get_os_name():
-    """Return the name of the operating system"""
+    """Return the name of the operating system (cached; it can't change)"""
     system = platform.system()
     if system == "Darwin":
         return "macOS"
@@ -93,7 +95,7 @@ def create_desktop_shortcut(script_path, shortcut_name="Security Log Analyzer"):
             desktop = os.path.expanduser("~/Desktop")
             path = os.path.join(desktop, f"{shortcut_name}.desktop")
             
-            with open(path, 'w') as f:)
+            with open(path, 'w') as f:
                 f.write("[Desktop Entry]\n")
                 f.write(f"Name={shortcut_name}\n")
                 f.write("Type=Application\n")